@@ -6,7 +6,7 @@ Python objetivo: 3.10+
 
 Descripción:
     Conecta a MySQL y verifica si existen registros duplicados
-    basados en la clave única (site_id, source, observation_time).
+    basados en (site_id, observation_time).
 
 Uso:
     python check_duplicates_mysql.py
@@ -23,11 +23,15 @@ import sys
 from typing import List, Tuple
 
 import pymysql
+import pymysql.cursors
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Cantidad máxima de grupos duplicados que se muestran como ejemplo
+MAX_EXAMPLES = 10
+
 
 def get_db_connection():
     """
@@ -53,32 +57,45 @@ def get_db_connection():
         sys.exit(1)
 
 
-def check_duplicates() -> Tuple[bool, List[Tuple]]:
+def check_duplicates(max_examples: int = MAX_EXAMPLES) -> Tuple[int, List[Tuple]]:
     """
     Verifica si existen duplicados en la tabla weather_observations.
     
+    Recorre el resultado con un cursor server-side (SSCursor): solo se
+    guardan en memoria los primeros `max_examples` grupos, el resto se cuenta.
+    
+    Args:
+        max_examples: Cantidad máxima de grupos duplicados a retornar
+    
     Returns:
-        Tupla (hay_duplicados, lista_de_duplicados)
+        Tupla (total_grupos_duplicados, ejemplos_de_duplicados)
     """
+    # GROUP BY sigue el prefijo (site_id, observation_time) de la clave única
+    # y no hay ORDER BY por cnt: MySQL agrupa recorriendo el índice en orden,
+    # sin tabla temporal ni filesort.
     query = """
     SELECT 
         site_id, 
-        source, 
         observation_time, 
         COUNT(*) AS cnt
     FROM weather_observations
-    GROUP BY site_id, source, observation_time
+    GROUP BY site_id, observation_time
     HAVING cnt > 1
-    ORDER BY cnt DESC, site_id, observation_time
     """
     
     try:
         with get_db_connection() as conn:
-            with conn.cursor() as cursor:
+            with conn.cursor(pymysql.cursors.SSCursor) as cursor:
                 cursor.execute(query)
-                duplicates = cursor.fetchall()
                 
-                return len(duplicates) > 0, duplicates
+                total_groups = 0
+                examples = []
+                for row in cursor:
+                    if total_groups < max_examples:
+                        examples.append(row)
+                    total_groups += 1
+                
+                return total_groups, examples
                 
     except Exception as e:
         print(f"ERROR ejecutando consulta: {e}")
@@ -89,30 +106,30 @@ def main():
     """Función principal del script."""
     print("Verificando duplicados en weather_observations...")
     
-    # Verificar duplicados
-    has_duplicates, duplicates = check_duplicates()
+    # Verificar duplicados: un solo recorrido del índice en orden
+    total_groups, examples = check_duplicates()
     
-    if not has_duplicates:
+    if total_groups == 0:
         print("OK: no duplicate groups found.")
         sys.exit(0)
     else:
-        print(f"ERROR: Se encontraron {len(duplicates)} grupos duplicados:")
+        print(f"ERROR: Se encontraron {total_groups} grupos duplicados:")
         print()
         
         # Mostrar ejemplos de duplicados
         print("Ejemplos de duplicados encontrados:")
         print("-" * 80)
-        print(f"{'Site ID':<8} {'Source':<15} {'Observation Time':<20} {'Count':<5}")
+        print(f"{'Site ID':<8} {'Observation Time':<26} {'Count':<5}")
         print("-" * 80)
         
-        for site_id, source, obs_time, count in duplicates[:10]:  # Mostrar máximo 10
-            print(f"{site_id:<8} {source:<15} {str(obs_time):<20} {count:<5}")
+        for site_id, obs_time, count in examples:
+            print(f"{site_id:<8} {str(obs_time):<26} {count:<5}")
         
-        if len(duplicates) > 10:
-            print(f"... y {len(duplicates) - 10} grupos más")
+        if total_groups > len(examples):
+            print(f"... y {total_groups - len(examples)} grupos más")
         
         print("-" * 80)
-        print(f"Total de grupos duplicados: {len(duplicates)}")
+        print(f"Total de grupos duplicados: {total_groups}")
         print()
         print("Recomendación: Revisar el proceso ETL para evitar duplicados.")
         
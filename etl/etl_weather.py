@@ -22,22 +22,38 @@ Autor: Mariana Garcia
 """
 
 import argparse
+import collections
+import contextlib
+import functools
 import json
 import logging
 import os
+import queue
 import sys
+import threading
+import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from itertools import chain, islice, repeat
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import pymysql
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryCallState
-from tqdm import tqdm
 
-from utils.db_queries import get_insert_weather_observation_query
+try:
+    import MySQLdb as db_driver  # mysqlclient (extensión C, opcional)
+except ImportError:
+    import pymysql as db_driver
+
+try:
+    import orjson  # Parser JSON rápido (opcional)
+except ImportError:
+    orjson = None
+
+from utils.db_queries import check_weather_observation_row, get_insert_weather_observation_query
 
 # Configurar logging
 logging.basicConfig(
@@ -47,6 +63,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+UTC = timezone.utc
+
+# Archivo de configuración de sitios (resuelto una sola vez al importar)
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'sites_sample.json'
+
+# Cantidad de sitios completados que se acumulan antes de refrescar la barra de progreso
+PROGRESS_UPDATE_EVERY = 32
+
+# Barra de progreso solo en terminales interactivas (no en cron/CI) y si no se desactiva con NO_PROGRESS
+PROGRESS = sys.stderr.isatty() and not os.getenv('NO_PROGRESS')
+
+# Máximo de lotes pendientes en la cola del hilo escritor (backpressure sobre los workers)
+WRITE_QUEUE_MAXSIZE = 32
+
+# Dimensionamiento adaptativo del pool (solo si TARGET_RPS está definido)
+WARMUP_SITES = 4
+MAX_AUTO_WORKERS = 50
+
+# Mensajes de error conservados para el resumen final
+MAX_KEPT_ERRORS = 32
+
+
+@functools.lru_cache(maxsize=1)
+def _load_sites(config_path: Path) -> Tuple[Dict, ...]:
+    """
+    Lee y parsea el archivo de sitios una sola vez por proceso.
+    
+    Retorna una tupla para que el resultado cacheado no se modifique entre llamadas.
+    """
+    raw = config_path.read_bytes()
+    return tuple(orjson.loads(raw) if orjson else json.loads(raw))
+
+
+def _progress_bar(total: int):
+    """
+    Barra de progreso de tqdm, o un contexto vacío (None) si no hay terminal.
+    
+    tqdm se importa solo cuando se muestra la barra.
+    """
+    if not PROGRESS:
+        return contextlib.nullcontext()
+    from tqdm import tqdm
+    return tqdm(total=total, desc="Procesando sitios", mininterval=1.0)
+
 
 class WeatherETL:
     """Clase principal para el procesamiento ETL de datos climáticos."""
@@ -59,7 +119,13 @@ class WeatherETL:
             dry_run: Si True, no escribe datos a la base de datos
         """
         self.dry_run = dry_run
-        self.ingestion_run_id = str(uuid.uuid4())
+        # El run id se guarda como BINARY(16); la forma texto se usa solo en logs
+        self.ingestion_run_uuid = uuid.uuid4()
+        self.ingestion_run_id = self.ingestion_run_uuid.bytes
+        self.ingestion_run_id_str = str(self.ingestion_run_uuid)
+        # Momento de extracción de la ejecución: compartido por todos los registros.
+        # Se formatea una sola vez como literal DATETIME(3) de MySQL
+        self.fetch_time = datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
         
         # Cargar variables de entorno
         load_dotenv()
@@ -73,23 +139,82 @@ class WeatherETL:
                 'database': os.getenv('DB_NAME'),
                 'charset': 'utf8mb4'
             }
+            # ingestion_run_id es BINARY(16): pymysql siempre envía los bytes con el
+            # prefijo _binary, mysqlclient solo con binary_prefix=True (sin él los
+            # bytes del UUID se interpretan como texto utf8mb4 inválido)
+            if db_driver.__name__ == 'MySQLdb':
+                self.db_config['binary_prefix'] = True
+            # Modo carga masiva (solo entornos no productivos): la sesión del ETL no
+            # escribe en el binlog, evitando su escritura y fsync en cada commit.
+            # innodb_flush_log_at_trx_commit es global y unique_checks=0 rompería
+            # la deduplicación de la clave única, por eso no se tocan aquí.
+            if os.getenv('ETL_BULK_MODE') == '1':
+                self.db_config['init_command'] = 'SET SESSION sql_log_bin=0'
             self.api_base = os.getenv('API_BASE')
             self.max_workers = int(os.getenv('MAX_WORKERS'))
             self.request_timeout = int(os.getenv('REQUEST_TIMEOUT'))
             self.max_retries = int(os.getenv('MAX_RETRIES'))
+            # Tamaño de los lotes de inserción por sitio
+            self.batch_size = int(os.getenv('BATCH_SIZE', '200'))
+            # Registros acumulados por el hilo escritor antes de cada executemany + commit
+            # (acotado para que el INSERT multi-fila no supere max_allowed_packet)
+            self.flush_rows = int(os.getenv('DB_FLUSH_ROWS', '1000'))
+            # Tasa objetivo de requests/s; si es > 0 el pool se dimensiona tras un warmup
+            self.target_rps = float(os.getenv('TARGET_RPS', '0'))
+            # Parámetros de la API comunes a todos los sitios
+            self._params_base = {
+                'start_date': os.getenv('START_DATE', '2024-01-01'),
+                'end_date': os.getenv('END_DATE', '2025-10-30'),
+                'hourly': 'temperature_2m,relative_humidity_2m,precipitation',
+            }
         else: 
             raise EnvironmentError("Variables de entorno no configuradas correctamente")
 
-        # Estadísticas de ejecución
+        # Query de inserción resuelta una sola vez por ejecución
+        self.insert_query = get_insert_weather_observation_query()
+
+        # Sesión HTTP compartida: reutiliza conexiones keep-alive (TCP + TLS) entre sitios
+        self.session = requests.Session()
+        http_pool_size = max(self.max_workers, MAX_AUTO_WORKERS) if self.target_rps > 0 else self.max_workers
+        adapter = HTTPAdapter(
+            pool_connections=http_pool_size,
+            pool_maxsize=http_pool_size,
+            max_retries=0  # Los reintentos se manejan en fetch_weather_data
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Conexiones MySQL persistentes: una por hilo worker, reutilizada entre sitios
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+        # Latencias de fetch (segundos) usadas para dimensionar el pool
+        self._fetch_latencies = []
+
+        # Cola de lotes normalizados hacia el hilo escritor de MySQL
+        self.write_queue = queue.Queue(maxsize=WRITE_QUEUE_MAXSIZE)
+        self._writer_thread = None
+
+        # Estadísticas de ejecución. Los errores se registran desde el hilo principal
+        # y desde el hilo escritor, por eso error_count se actualiza bajo lock
+        self._errors_lock = threading.Lock()
         self.stats = {
             'total_sites': 0,
             'successful': 0,
             'failed': 0,
-            'errors': []
+            'records_saved': 0,
+            'records_failed': 0,
+            'failed_sites': [],
+            # Solo se conservan los últimos mensajes; el total va en error_count
+            'errors': collections.deque(maxlen=MAX_KEPT_ERRORS),
+            'error_count': 0
         }
         
-        logger.info(f"Iniciando ETL - Run ID: {self.ingestion_run_id}")
-        logger.info(f"Modo dry-run: {'SÍ' if self.dry_run else 'NO'}")
+        logger.info("Iniciando ETL - Run ID: %s", self.ingestion_run_id_str)
+        logger.info("Modo dry-run: %s", 'SÍ' if self.dry_run else 'NO')
+        if 'init_command' in self.db_config:
+            logger.warning("ETL_BULK_MODE activo: las escrituras del ETL no se replican por binlog")
 
     def _validate_env_variables(self) -> bool:
         """
@@ -105,64 +230,55 @@ class WeatherETL:
             Lista de diccionarios con información de sitios
         """
         try:
-            config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'sites_sample.json')
-            with open(config_path, 'r', encoding='utf-8') as f:
-                sites = json.load(f)
+            sites = list(_load_sites(CONFIG_PATH))
             
-            logger.info(f"Cargados {len(sites)} sitios desde configuración")
+            logger.info("Cargados %d sitios desde configuración", len(sites))
             return sites
             
         except Exception as e:
-            logger.error(f"Error cargando sitios: {e}")
+            logger.error("Error cargando sitios: %s", e)
             raise
     
-    def log_retry_attempt(retry_state: RetryCallState):
-        """
-        Loggea cada reintento de la API.
+    def fetch_weather_data(self, site: Dict) -> Optional[Iterator[Tuple]]:
         """
-        attempt_number = retry_state.attempt_number
-        exception = retry_state.outcome.exception()
-        next_wait = retry_state.next_action.sleep if retry_state.next_action else None
-        site_name = retry_state.args[1].get('name') if len(retry_state.args) > 1 and isinstance(retry_state.args[1], dict) else "Unknown"
-
-        logger.warning(
-            f"WARNING: Reintento {attempt_number} para {site_name} "
-            f"debido a: {type(exception).__name__} - {exception}. "
-            f"Siguiente intento en {next_wait:.1f} segundos." if next_wait else ""
-        )
-
-    @retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=10),  # backoff exponencial
-    retry=retry_if_exception_type((requests.exceptions.RequestException,)),
-    before_sleep=log_retry_attempt
-    )
-
-    def fetch_weather_data(self, site: Dict) -> Optional[List[Dict]]:
-        """
-        Obtiene datos meteorológicos para un sitio específico.
+        Obtiene datos meteorológicos para un sitio específico, con reintentos
+        y backoff exponencial (4s, 4s, 4s, 8s, máx. 10s) ante errores de red o HTTP.
         
         Args:
             site: Diccionario con información del sitio (lat, lon, site_id)
             
         Returns:
-            Lista de diccionarios con datos meteorológicos normalizados o None si falla
+            Generador de tuplas con datos meteorológicos normalizados o None si falla
+        """
+        attempts = max(1, self.max_retries)
+        for attempt in range(1, attempts + 1):
+            try:
+                return self._request_weather_data(site)
+            except requests.exceptions.RequestException as e:
+                if attempt == attempts:
+                    raise
+                # Mismo calendario que wait_exponential(min=4, max=10) de tenacity
+                wait = min(10, max(4, 2 ** (attempt - 1)))
+                logger.warning(
+                    "WARNING: Reintento %d para %s debido a: %s - %s. Siguiente intento en %.1f segundos.",
+                    attempt, site.get('name', 'Unknown'), type(e).__name__, e, wait
+                )
+                time.sleep(wait)
+
+    def _request_weather_data(self, site: Dict) -> Iterator[Tuple]:
+        """
+        Realiza una única llamada a la API para un sitio.
         """
         # Construir URL de la API - scheduler
         params = {
             'latitude': site['latitude'],
             'longitude': site['longitude'],
             'timezone': site['timezone'],
-            ## CAMBIAR ESTO 
-            ## CAMBIAR ESTO 
-            ## NO HARCODEAR VARIABLES 
-            'start_date': '2024-01-01',
-            'end_date': '2025-10-30',
-            'hourly': 'temperature_2m,relative_humidity_2m,precipitation',
+            **self._params_base,
         }
         
         # Realizar llamada a la API
-        response = requests.get(
+        response = self.session.get(
             self.api_base,
             params=params,
             timeout=self.request_timeout
@@ -170,159 +286,199 @@ class WeatherETL:
         
         if response.status_code in (429, 404, 405, 408, 409,500, 502, 503, 504):
             # Errores temporales → se loggean como warning para reintento
-            logger.warning(f"WARNING: Respuesta {response.status_code} de la API para {site['site_id']}. Reintentando...")
+            logger.warning("WARNING: Respuesta %d de la API para %s. Reintentando...", response.status_code, site['site_id'])
             raise requests.exceptions.RequestException(f"Respuesta {response.status_code}")
         # generar alerta si no se obtuvieron datos
         elif response.status_code == 200: 
-            logger.info(f"Datos obtenidos para sitio {site['site_id']} ({site['name']}) - {len(response.json())} registros")
-            data = response.json()
+            # Parsear el JSON una sola vez: el payload horario del rango completo es grande
+            try:
+                data = orjson.loads(response.content) if orjson else response.json()
+            except ValueError as e:
+                # Cuerpo truncado o inválido: se reintenta como cualquier error de red
+                raise requests.exceptions.RequestException(f"JSON inválido en la respuesta: {e}") from e
+            logger.info("Datos obtenidos para sitio %s (%s)", site['site_id'], site['name'])
             
-            normalized_data = self._normalize_weather_data(data, site)
-         
-            logger.debug(f"Datos obtenidos para sitio {site['site_id']} ({site['name']}) - {len(normalized_data)} registros")
-            return normalized_data
+            return self._normalize_weather_data(data, site)
         else:
-            logger.error(f"Estado aceptado pero no se obtuvieron datos para {site['site_id']}: status code: {response.status_code}")
+            logger.error("Estado aceptado pero no se obtuvieron datos para %s: status code: %d", site['site_id'], response.status_code)
             raise requests.exceptions.RequestException(f"Respuesta {response.status_code}")
     
-    def _normalize_weather_data(self, raw_data: Dict, site: Dict) -> List[Dict]:
+    def _normalize_weather_data(self, raw_data: Dict, site: Dict) -> Iterator[Tuple]:
         """
         Normaliza los datos meteorológicos de la API (formato archive).
-        Retorna una lista de registros normalizados para todo el rango de fechas.
+        Genera los registros normalizados de todo el rango de fechas uno por uno,
+        para que process_site los guarde en lotes sin materializar la lista completa.
+        
+        Cada registro es una tupla en el orden de INSERT_WEATHER_OBSERVATION_COLUMNS:
+        (site_id, observation_time, temp_c, humidity_pct, precipitation_mm,
+        ingestion_run_id, fetch_time)
         """
-        try:
-            site_id = site['site_id']
-            now_utc = datetime.now(timezone.utc)
-            normalized_records = []
-
-            if "hourly" in raw_data:
-                hourly = raw_data["hourly"]
-                times = hourly.get("time", [])
-                temps = hourly.get("temperature_2m", [])
-                hums = hourly.get("relative_humidity_2m", [])
-                precs = hourly.get("precipitation", [])
-
-                if not times or times is None:
-                    raise ValueError("No se encontraron timestamps en la respuesta")
-                # generar alerta si no se obtuvieron timestamps
-                # Procesar TODOS los registros del rango de fechas
-                for i in range(len(times)):
-                    observation_time = datetime.fromisoformat(times[i])
-                    
-                    # Verificación defensiva: evitar IndexError si las listas tienen diferentes longitudes
-                    temp_c = temps[i] if i < len(temps) else None
-                    humidity_pct = hums[i] if i < len(hums) else None
-                    precipitation_mm = precs[i] if i < len(precs) else None
-
-                    normalized_record = {
-                        "site_id": site_id,
-                        "observation_time": observation_time,
-                        "fetch_time": now_utc,
-                        "temp_c": temp_c,
-                        "humidity_pct": humidity_pct,
-                        "precipitation_mm": f"{precipitation_mm}",
-                        "ingestion_run_id": self.ingestion_run_id
-                    }
-                    normalized_records.append(normalized_record)
-
-                logger.info(f"Procesados {len(normalized_records)} registros para sitio {site_id}")
-                return normalized_records
-  
-            else:
-                logger.error(f"Estructura de respuesta no reconocida para sitio {site_id}") 
-                raise ValueError("Estructura de respuesta no reconocida.")
+        site_id = site['site_id']
 
+        hourly = raw_data.get("hourly")
+        if hourly is None:
+            logger.error("Estructura de respuesta no reconocida para sitio %s", site_id)
+            raise ValueError("Estructura de respuesta no reconocida.")
 
-        except Exception as e:
-            logger.error(f"Error normalizando datos para sitio {site_id}: {e}")
-            raise
+        # generar alerta si no se obtuvieron timestamps
+        times = hourly.get("time")
+        if not times:
+            raise ValueError("No se encontraron timestamps en la respuesta")
+
+        # Procesar TODOS los registros del rango de fechas.
+        # Las listas de valores se rellenan con None para tolerar longitudes
+        # distintas; zip se detiene en el último timestamp.
+        # Los timestamps repetidos se descartan aquí (site_id es fijo en la
+        # llamada) para no enviar filas duplicadas al upsert.
+        # observation_time se envía como el string ISO de la API
+        # ('YYYY-MM-DDTHH:MM'), que MySQL acepta directamente en DATETIME:
+        # no se construye un datetime por fila solo para volver a formatearlo.
+        # Los errores se propagan a process_site, que los registra.
+        ingestion_run_id = self.ingestion_run_id
+        fetch_time = self.fetch_time
+        seen_times = set()
+        records_count = 0
+        for observation_time, temp_c, humidity_pct, precipitation_mm in zip(
+            times,
+            chain(hourly.get("temperature_2m", ()), repeat(None)),
+            chain(hourly.get("relative_humidity_2m", ()), repeat(None)),
+            chain(hourly.get("precipitation", ()), repeat(None))
+        ):
+            if observation_time in seen_times:
+                continue
+            seen_times.add(observation_time)
+            records_count += 1
+            yield (
+                site_id,
+                observation_time,
+                temp_c,
+                humidity_pct,
+                precipitation_mm,
+                ingestion_run_id,
+                fetch_time
+            )
+
+        if records_count < len(times):
+            logger.warning(
+                "Descartados %d timestamps duplicados para sitio %s",
+                len(times) - records_count, site_id
+            )
+
+        logger.info("Procesados %d registros para sitio %s", records_count, site_id)
 
-        
     def get_db_connection(self):
-        """Obtiene una conexión a la base de datos MySQL."""
+        """
+        Obtiene la conexión MySQL del hilo actual, creándola la primera vez.
+        
+        La conexión queda abierta y se reutiliza en las siguientes llamadas del
+        mismo hilo; se cierran todas al final de run_etl.
+        """
+        conn = getattr(self._local, 'conn', None)
         try:
-            connection = pymysql.connect(**self.db_config)
-            return connection
+            if conn is not None:
+                try:
+                    # pymysql reconecta en ping(); mysqlclient lanza OperationalError
+                    conn.ping()
+                except db_driver.OperationalError:
+                    conn = None
+            if conn is None:
+                conn = db_driver.connect(**self.db_config)
+                self._local.conn = conn
+                with self._connections_lock:
+                    self._connections.append(conn)
+            return conn
         except Exception as e:
-            logger.error(f"Error conectando a MySQL: {e}")
+            logger.error("Error conectando a MySQL: %s", e)
             raise
+
+    def close_db_connections(self):
+        """Cierra todas las conexiones abiertas por los hilos workers."""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception as e:
+                    logger.debug("Error cerrando conexión MySQL: %s", e)
+            self._connections.clear()
+
+    def _rollback_quietly(self):
+        """Revierte la transacción en curso del hilo actual, si la hay."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        try:
+            conn.rollback()
+        except Exception as e:
+            logger.debug("Error revirtiendo transacción: %s", e)
     
-    def save_weather_data_batch(self, weather_data_list: List[Dict]) -> Tuple[int, int]:
+    def save_weather_data_batch(self, weather_data_list: List[Tuple]) -> Tuple[int, int]:
         """
         Guarda múltiples registros meteorológicos usando una sola conexión y batch insert.
         
         Args:
-            weather_data_list: Lista de diccionarios con datos normalizados
+            weather_data_list: Lista de tuplas normalizadas, en el orden de columnas
+                de INSERT_WEATHER_OBSERVATION
             
         Returns:
             Tupla (registros_exitosos, total_registros)
+            
+        Raises:
+            ValueError: Si las filas no tienen una columna por cada
+                INSERT_WEATHER_OBSERVATION_COLUMNS
         """
-        if self.dry_run:
-            logger.info(f"[DRY-RUN] Guardando {len(weather_data_list)} registros")
-            return len(weather_data_list), len(weather_data_list)
-        
         if not weather_data_list:
             return 0, 0
         
+        # Las filas de un lote son homogéneas: basta con verificar la primera
+        check_weather_observation_row(weather_data_list[0])
+        
+        if self.dry_run:
+            logger.debug("[DRY-RUN] Guardando %d registros", len(weather_data_list))
+            return len(weather_data_list), len(weather_data_list)
+        
         successful = 0
         try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    insert_query = get_insert_weather_observation_query()
-                    
-                    # Preparar todos los parámetros como tuplas
-                    params_list = []
-                    for weather_data in weather_data_list:
-                        params = (
-                            weather_data['site_id'],
-                            weather_data['observation_time'],
-                            weather_data['temp_c'],
-                            weather_data['humidity_pct'],
-                            weather_data['precipitation_mm'],
-                            weather_data['ingestion_run_id'],
-                            weather_data['fetch_time']
-                        )
-                        params_list.append(params)
-                    
-                    # Ejecutar batch insert
-                    cursor.executemany(insert_query, params_list)
-                    conn.commit()
-                    successful = len(params_list)
+            conn = self.get_db_connection()
+            with conn.cursor() as cursor:
+                # Ejecutar batch insert: los registros ya vienen como tuplas posicionales
+                cursor.executemany(self.insert_query, weather_data_list)
+                conn.commit()
+                successful = len(weather_data_list)
             
             return successful, len(weather_data_list)
             
         except Exception as e:
-            logger.error(f"Error guardando batch de datos: {e}")
+            logger.error("Error guardando batch de datos: %s", e)
+            self._rollback_quietly()
             # Intentar guardar uno por uno como fallback
             return self._save_weather_data_fallback(weather_data_list)
     
-    def _save_weather_data_fallback(self, weather_data_list: List[Dict]) -> Tuple[int, int]:
-        """Fallback: guarda registros uno por uno si el batch falla."""
+    def _save_weather_data_fallback(self, weather_data_list: List[Tuple]) -> Tuple[int, int]:
+        """
+        Fallback: guarda registros uno por uno si el batch falla.
+
+        Reutiliza una sola conexión para todo el lote; cada registro se confirma
+        (o se revierte) por separado para aislar los registros inválidos.
+        """
         successful = 0
-        for weather_data in weather_data_list:
-            try:
-                with self.get_db_connection() as conn:
-                    with conn.cursor() as cursor:
-                        insert_query = get_insert_weather_observation_query()
-                        params = (
-                            weather_data['site_id'],
-                            weather_data['observation_time'],
-                            weather_data['temp_c'],
-                            weather_data['humidity_pct'],
-                            weather_data['precipitation_mm'],
-                            weather_data['ingestion_run_id'],
-                            weather_data['fetch_time']
-                        )
-                        cursor.execute(insert_query, params)
+        try:
+            conn = self.get_db_connection()
+            with conn.cursor() as cursor:
+                for params in weather_data_list:
+                    try:
+                        cursor.execute(self.insert_query, params)
                         conn.commit()
                         successful += 1
-            except Exception as e:
-                logger.warning(f"Error guardando registro individual: {e}")
+                    except db_driver.Error as e:
+                        conn.rollback()
+                        logger.warning("Error guardando registro individual: %s", e)
+        except Exception as e:
+            logger.error("Error en fallback de guardado individual: %s", e)
         return successful, len(weather_data_list)
     
     def process_site(self, site: Dict) -> Tuple[bool, str]:
         """
-        Procesa un sitio individual: obtiene datos y los guarda.
+        Procesa un sitio individual: obtiene datos y los envía al hilo escritor.
         
         Args:
             site: Diccionario con información del sitio
@@ -331,29 +487,152 @@ class WeatherETL:
             Tupla (éxito, mensaje)
         """
         try:
-            # Obtener datos meteorológicos (ahora es una lista)
-            weather_data_list = self.fetch_weather_data(site)
+            # Obtener datos meteorológicos (generador de registros normalizados)
+            start = time.perf_counter()
+            weather_data = self.fetch_weather_data(site)
+            self._fetch_latencies.append(time.perf_counter() - start)
             
-            if weather_data_list is None or len(weather_data_list) == 0:
+            if weather_data is None:
                 return False, f"No se pudieron obtener datos para {site['name']}"
             
-            # Guardar todos los registros en batch usando una sola conexión
-            successful_saves, total_records = self.save_weather_data_batch(weather_data_list)
+            # Encolar en lotes de batch_size: la memoria queda acotada al tamaño
+            # del lote y el worker no espera a MySQL (salvo que la cola esté llena)
+            records_queued = 0
+            batch = []
+            for record in weather_data:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self.write_queue.put((site['name'], batch))
+                    records_queued += len(batch)
+                    batch = []
+            if batch:
+                self.write_queue.put((site['name'], batch))
+                records_queued += len(batch)
+            
+            if records_queued == 0:
+                return False, f"No se pudieron obtener datos para {site['name']}"
             
-            if successful_saves == total_records:
-                return True, f"Datos procesados exitosamente para {site['name']} - {successful_saves} registros guardados"
-            elif successful_saves > 0:
-                return False, f"Guardados parcialmente {successful_saves}/{total_records} registros para {site['name']}"
-            else:
-                return False, f"Error guardando datos para {site['name']}"
+            return True, f"Datos procesados exitosamente para {site['name']} - {records_queued} registros enviados a guardar"
                 
         except Exception as e:
             error_msg = f"Error procesando {site['name']}: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
     
+    def _start_writer(self):
+        """Inicia el hilo escritor que guarda en MySQL los lotes encolados."""
+        self._writer_thread = threading.Thread(target=self._writer_loop, name='db-writer', daemon=True)
+        self._writer_thread.start()
+
+    def _stop_writer(self):
+        """Envía la señal de fin al hilo escritor y espera a que vacíe la cola."""
+        if self._writer_thread is None:
+            return
+        self.write_queue.put(None)
+        self._writer_thread.join()
+        self._writer_thread = None
+
+    def _writer_loop(self):
+        """
+        Hilo escritor: drena la cola de lotes y los guarda con save_weather_data_batch.
+        
+        Es el único hilo que escribe en MySQL, así que los workers solo esperan
+        a la API y la conexión del escritor se reutiliza para todos los lotes.
+        Los lotes de distintos sitios se acumulan hasta flush_rows registros (o
+        hasta que la cola queda vacía) y se guardan con un solo executemany + commit.
+        """
+        # Abrir la conexión antes del primer lote: el handshake con MySQL se
+        # solapa con las primeras llamadas a la API en lugar de sumarse al primer flush
+        if not self.dry_run:
+            try:
+                self.get_db_connection()
+            except Exception:
+                logger.warning("No se pudo abrir la conexión del escritor por adelantado; se reintentará al guardar")
+        
+        pending, pending_sites = [], set()
+        while True:
+            try:
+                # Bloquear solo si no hay registros acumulados
+                item = self.write_queue.get(block=not pending)
+            except queue.Empty:
+                self._flush_pending(pending, pending_sites)
+                continue
+            
+            if item is None:
+                self._flush_pending(pending, pending_sites)
+                break
+            
+            site_name, batch = item
+            pending.extend(batch)
+            pending_sites.add(site_name)
+            if len(pending) >= self.flush_rows:
+                self._flush_pending(pending, pending_sites)
+
+    def _flush_pending(self, pending: List[Tuple], pending_sites: set):
+        """Guarda los registros acumulados por el hilo escritor y vacía el buffer."""
+        if not pending:
+            return
+        
+        try:
+            saved, total = self.save_weather_data_batch(pending)
+        except Exception as e:
+            logger.error("Error inesperado en el hilo escritor: %s", e)
+            saved, total = 0, len(pending)
+        
+        self.stats['records_saved'] += saved
+        if saved < total:
+            self.stats['records_failed'] += total - saved
+            self._add_error(
+                f"Guardados parcialmente {saved}/{total} registros para {', '.join(sorted(pending_sites))}"
+            )
+        
+        pending.clear()
+        pending_sites.clear()
+
+    def _autosize_workers(self, remaining_sites: int) -> int:
+        """
+        Calcula el tamaño del pool con la ley de Little: workers = tasa objetivo × latencia.
+        
+        Args:
+            remaining_sites: Cantidad de sitios pendientes de procesar
+            
+        Returns:
+            Cantidad de workers, entre MAX_WORKERS y max(MAX_WORKERS, MAX_AUTO_WORKERS)
+        """
+        if not self._fetch_latencies:
+            return max(1, min(self.max_workers, remaining_sites))
+        
+        avg_latency = sum(self._fetch_latencies) / len(self._fetch_latencies)
+        optimal = max(self.max_workers, int(self.target_rps * avg_latency))
+        workers = max(1, min(optimal, max(self.max_workers, MAX_AUTO_WORKERS), remaining_sites))
+        logger.info("Latencia media de fetch: %.2fs - pool ajustado a %d workers", avg_latency, workers)
+        return workers
+
+    def _add_error(self, message: str):
+        """Cuenta un error y guarda su mensaje para el resumen (thread-safe)."""
+        with self._errors_lock:
+            self.stats['error_count'] += 1
+            self.stats['errors'].append(message)
+
+    def _record_result(self, site: Dict, success: bool, message: str):
+        """Registra el resultado de un sitio en las estadísticas de ejecución."""
+        if success:
+            self.stats['successful'] += 1
+            logger.info("✓ %s", message)
+        else:
+            self.stats['failed'] += 1
+            self._add_error(message)
+            self.stats['failed_sites'].append(site['site_id'])
+            logger.error("✗ %s", message)
+
     def run_etl(self):
-        """Ejecuta el proceso ETL completo."""
+        """
+        Ejecuta el proceso ETL completo.
+        
+        Extracción y carga corren en paralelo: extract_all alimenta la cola del
+        hilo escritor, que guarda en MySQL. Los sitios que fallan en la extracción
+        nunca llegan a la base de datos y quedan listados en el resumen.
+        """
         try:
             # Cargar sitios
             sites = self.load_sites()
@@ -363,64 +642,101 @@ class WeatherETL:
                 logger.warning("No se encontraron sitios para procesar")
                 return
             
-            logger.info(f"Procesando {len(sites)} sitios con {self.max_workers} workers")
+            self._start_writer()
+            self.extract_all(sites)
             
-            # Procesar sitios en paralelo
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Enviar tareas
-                future_to_site = {
-                    executor.submit(self.process_site, site): site 
-                    for site in sites
-                }
-                
-                # Procesar resultados con barra de progreso
-                with tqdm(total=len(sites), desc="Procesando sitios") as pbar:
-                    for future in as_completed(future_to_site):
-                        site = future_to_site[future]
-                        
-                        try:
-                            success, message = future.result()
-                            
-                            if success:
-                                self.stats['successful'] += 1
-                                logger.info(f"✓ {message}")
-                            else:
-                                self.stats['failed'] += 1
-                                self.stats['errors'].append(message)
-                                logger.error(f"✗ {message}")
-                                
-                        except Exception as e:
-                            self.stats['failed'] += 1
-                            error_msg = f"Error inesperado procesando {site['name']}: {e}"
-                            self.stats['errors'].append(error_msg)
-                            logger.error(f"✗ {error_msg}")
-                        
-                        pbar.update(1)
+            # Esperar a que el escritor guarde los lotes pendientes
+            self._stop_writer()
             
-            # Mostrar resumen final
-            self._print_summary()
+            self.report()
             
         except Exception as e:
-            logger.error(f"Error crítico en ETL: {e}")
+            logger.error("Error crítico en ETL: %s", e)
             sys.exit(1)
+        finally:
+            self._stop_writer()
+            self.session.close()
+            self.close_db_connections()
+
+    def extract_all(self, sites: List[Dict]) -> List[str]:
+        """
+        Extrae y normaliza todos los sitios, encolando los registros para el escritor.
+        
+        Args:
+            sites: Lista de sitios a procesar
+            
+        Returns:
+            Lista de site_id que fallaron (dead-letter para re-procesar)
+        """
+        # Warmup: medir la latencia real con los primeros sitios (en serie)
+        # antes de dimensionar el pool para el resto
+        if self.target_rps > 0:
+            warmup_sites, sites = sites[:WARMUP_SITES], sites[WARMUP_SITES:]
+            logger.info("Warmup con %d sitios para dimensionar el pool", len(warmup_sites))
+            for site in warmup_sites:
+                self._record_result(site, *self.process_site(site))
+            workers = self._autosize_workers(len(sites))
+        else:
+            # No crear más hilos que sitios: los hilos sobrantes solo ocuparían memoria
+            workers = min(self.max_workers, len(sites))
+        
+        if sites:
+            logger.info("Procesando %d sitios con %d workers", len(sites), workers)
+            self._process_sites_parallel(sites, workers)
+        
+        return self.stats['failed_sites']
+
+    def _process_sites_parallel(self, sites: List[Dict], workers: int):
+        """
+        Procesa los sitios en paralelo con un ThreadPoolExecutor.
+        
+        Args:
+            sites: Lista de sitios a procesar
+            workers: Tamaño del pool de hilos
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # process_site captura sus excepciones, así que map no se interrumpe.
+            # Los resultados llegan en el orden de sites (el trabajo sigue en paralelo)
+            results = executor.map(self.process_site, sites)
+            
+            # Procesar resultados con barra de progreso
+            with _progress_bar(len(sites)) as pbar:
+                pending_updates = 0
+                for site, (success, message) in zip(sites, results):
+                    self._record_result(site, success, message)
+                    
+                    if pbar is None:
+                        continue
+                    pending_updates += 1
+                    if pending_updates >= PROGRESS_UPDATE_EVERY:
+                        pbar.update(pending_updates)
+                        pending_updates = 0
+                
+                if pending_updates:
+                    pbar.update(pending_updates)
     
-    def _print_summary(self):
+    def report(self):
         """Imprime el resumen final de la ejecución."""
         logger.info("=" * 60)
         logger.info("RESUMEN DE EJECUCIÓN ETL")
         logger.info("=" * 60)
-        logger.info(f"Run ID: {self.ingestion_run_id}")
-        logger.info(f"Total sitios: {self.stats['total_sites']}")
-        logger.info(f"Exitosos: {self.stats['successful']}")
-        logger.info(f"Fallidos: {self.stats['failed']}")
-        logger.info(f"Modo dry-run: {'SÍ' if self.dry_run else 'NO'}")
+        logger.info("Run ID: %s", self.ingestion_run_id_str)
+        logger.info("Total sitios: %d", self.stats['total_sites'])
+        logger.info("Exitosos: %d", self.stats['successful'])
+        logger.info("Fallidos: %d", self.stats['failed'])
+        logger.info("Registros guardados: %d", self.stats['records_saved'])
+        logger.info("Registros con error: %d", self.stats['records_failed'])
+        logger.info("Modo dry-run: %s", 'SÍ' if self.dry_run else 'NO')
+        
+        if self.stats['failed_sites']:
+            logger.info("Sitios a re-procesar: %s", ', '.join(self.stats['failed_sites']))
         
-        if self.stats['errors']:
-            logger.info("\nErrores encontrados:")
-            for error in self.stats['errors'][:5]:  # Mostrar solo los primeros 5
-                logger.info(f"  - {error}")
-            if len(self.stats['errors']) > 5:
-                logger.info(f"  ... y {len(self.stats['errors']) - 5} errores más")
+        if self.stats['error_count']:
+            logger.info("\nErrores encontrados: %d", self.stats['error_count'])
+            for error in islice(self.stats['errors'], 5):  # Mostrar solo 5
+                logger.info("  - %s", error)
+            if self.stats['error_count'] > 5:
+                logger.info("  ... y %d errores más", self.stats['error_count'] - 5)
         
         logger.info("=" * 60)
 
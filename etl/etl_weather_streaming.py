@@ -6,9 +6,10 @@ Python objetivo: 3.10+
 
 Descripción:
     Script ETL que extrae datos meteorológicos de forecast API en modo streaming,
-    los normaliza y los almacena en MySQL inmediatamente a medida que se procesan.
-    A diferencia del ETL batch, este procesa y guarda datos uno por uno o en
-    pequeños lotes para minimizar la latencia.
+    los normaliza y los envía a un único hilo escritor a medida que se procesan.
+    El escritor agrupa los registros de todos los sitios y los guarda en MySQL
+    al acumular STREAMING_FLUSH_ROWS registros o cada STREAMING_FLUSH_SECONDS,
+    acotando la latencia de escritura sin un commit por cada lote pequeño.
 
 Uso:
     python etl_weather_streaming.py [--dry-run] [--interval SECONDS]
@@ -27,23 +28,33 @@ Autor: Basado en etl_weather.py
 """
 
 import argparse
+import functools
 import json
 import logging
 import os
+import queue
 import sys
+import threading
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from itertools import chain, repeat
 from typing import Dict, Iterator, List, Optional, Tuple
 
 import pymysql
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryCallState
 from tqdm import tqdm
 
-from utils.db_queries import get_insert_weather_observation_query
+try:
+    import orjson  # Parser JSON rápido (opcional)
+except ImportError:
+    orjson = None
+
+from utils.db_queries import check_weather_observation_row, get_insert_weather_observation_query
 
 # Configurar logging
 logging.basicConfig(
@@ -53,10 +64,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Máximo de lotes pendientes en la cola del hilo escritor (backpressure sobre los workers)
+WRITE_QUEUE_MAXSIZE = 2000
+
+# Desde Python 3.11 datetime.fromisoformat acepta el sufijo 'Z' directamente
+_PY311 = sys.version_info >= (3, 11)
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_iso(time_str: str) -> datetime:
+    """
+    Convierte un timestamp ISO de la API a datetime, con caché.
+    
+    La grilla horaria del forecast es la misma para todos los sitios de una zona
+    horaria, así que tras el primer sitio casi todas las llamadas son aciertos.
+    """
+    if _PY311 or not time_str.endswith('Z'):
+        return datetime.fromisoformat(time_str)
+    return datetime.fromisoformat(time_str[:-1] + '+00:00')
+
 
 class WeatherETLStreaming:
     """Clase principal para el procesamiento ETL de datos climáticos en modo streaming."""
 
+    # Configuración del entorno, cacheada por _config()
+    _cfg_cache: Optional[Dict] = None
+
     def __init__(self, dry_run: bool = False):
         """
         Inicializa el ETL con configuración desde variables de entorno.
@@ -65,43 +98,120 @@ class WeatherETLStreaming:
             dry_run: Si True, no escribe datos a la base de datos
         """
         self.dry_run = dry_run
-        self.ingestion_run_id = str(uuid.uuid4())
         
-        # Cargar variables de entorno
-        load_dotenv()
+        # Configuración leída del entorno una sola vez por proceso
+        cfg = type(self)._config()
+        self.db_config = cfg['db_config']
+        self.api_base = cfg['api_base']
+        self.fetch_concurrency = cfg['fetch_concurrency']
+        self.request_timeout = cfg['request_timeout']
+        self.max_retries = cfg['max_retries']
+        self.streaming_batch_size = cfg['streaming_batch_size']
+        self.flush_rows = cfg['flush_rows']
+        self.flush_seconds = cfg['flush_seconds']
+
+        # Query de inserción resuelta una sola vez por ejecución
+        self.insert_query = get_insert_weather_observation_query()
+
+        # Sesión HTTP compartida: reutiliza conexiones keep-alive (TCP + TLS) entre sitios
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.fetch_concurrency,
+            pool_maxsize=self.fetch_concurrency,
+            max_retries=0  # Los reintentos se manejan con tenacity
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Conexión MySQL persistente del hilo escritor (el único que escribe en MySQL),
+        # reutilizada entre lotes y entre ciclos del modo continuo
+        self._conn = None
+
+        # Cola de lotes normalizados hacia el hilo escritor de MySQL
+        self.write_queue = queue.Queue(maxsize=WRITE_QUEUE_MAXSIZE)
+        self._writer_thread = None
+
+        # Run id y estadísticas de la ejecución
+        self._reset_run_state()
+        
+        logger.info(f"Modo dry-run: {'SÍ' if self.dry_run else 'NO'}")
+        logger.info(f"Escritura cada {self.flush_rows} registros o {self.flush_seconds:g} s")
+        if 'init_command' in self.db_config:
+            logger.warning("ETL_BULK_MODE activo: las escrituras del ETL no se replican por binlog")
+
+    def _reset_run_state(self):
+        """
+        Inicia una nueva ejecución: nuevo run id y estadísticas en cero.
+        
+        La sesión HTTP, la conexión MySQL del escritor, la configuración y la cola
+        se conservan entre ejecuciones; se liberan con close().
+        """
+        # El run id se guarda como BINARY(16); la forma texto se usa solo en logs
+        self.ingestion_run_uuid = uuid.uuid4()
+        self.ingestion_run_id = self.ingestion_run_uuid.bytes
+        self.ingestion_run_id_str = str(self.ingestion_run_uuid)
         
-        if self._validate_env_variables():
-            self.db_config = {
-                'host': os.getenv('DB_HOST'),
-                'port': int(os.getenv('DB_PORT')),
-                'user': os.getenv('DB_USER'),
-                'password': os.getenv('DB_PASSWORD'),
-                'database': os.getenv('DB_NAME'),
-                'charset': 'utf8mb4'
-            }
-            # API base para forecast (diferente del batch que usa archive)
-            self.api_base = os.getenv('API_BASE_FORECAST', 'https://api.open-meteo.com/v1/forecast')
-            self.max_workers = int(os.getenv('MAX_WORKERS', '4'))  # Menos workers para streaming
-            self.request_timeout = int(os.getenv('REQUEST_TIMEOUT', '30'))
-            self.max_retries = int(os.getenv('MAX_RETRIES', '3'))
-            self.streaming_batch_size = int(os.getenv('STREAMING_BATCH_SIZE', '10'))  # Tamaño de lote para streaming
-        else: 
-            raise EnvironmentError("Variables de entorno no configuradas correctamente")
-
-        # Estadísticas de ejecución
         self.stats = {
             'total_sites': 0,
             'successful': 0,
             'failed': 0,
             'records_processed': 0,
+            'records_saved': 0,
+            'records_failed': 0,
             'errors': []
         }
         
-        logger.info(f"Iniciando ETL Streaming - Run ID: {self.ingestion_run_id}")
-        logger.info(f"Modo dry-run: {'SÍ' if self.dry_run else 'NO'}")
-        logger.info(f"Tamaño de lote streaming: {self.streaming_batch_size}")
+        logger.info(f"Iniciando ETL Streaming - Run ID: {self.ingestion_run_id_str}")
+
+    @classmethod
+    def _config(cls) -> Dict:
+        """
+        Carga y valida la configuración desde variables de entorno.
+        
+        Se resuelve una sola vez por proceso: en modo continuo cada ciclo
+        reutiliza la misma configuración sin volver a leer el .env.
+        """
+        if cls._cfg_cache is None:
+            load_dotenv()
+            
+            if not cls._validate_env_variables():
+                raise EnvironmentError("Variables de entorno no configuradas correctamente")
+            
+            db_config = {
+                'host': os.getenv('DB_HOST'),
+                'port': int(os.getenv('DB_PORT')),
+                'user': os.getenv('DB_USER'),
+                'password': os.getenv('DB_PASSWORD'),
+                'database': os.getenv('DB_NAME'),
+                'charset': 'utf8mb4'
+            }
+            # Modo carga masiva (solo entornos no productivos), igual que en el ETL
+            # batch: la sesión no escribe en el binlog. unique_checks=0 dejaría pasar
+            # duplicados de la clave única que usa el upsert, por eso no se toca.
+            if os.getenv('ETL_BULK_MODE') == '1':
+                db_config['init_command'] = 'SET SESSION sql_log_bin=0'
+            
+            cls._cfg_cache = {
+                'db_config': db_config,
+                # API base para forecast (diferente del batch que usa archive)
+                'api_base': os.getenv('API_BASE_FORECAST', 'https://api.open-meteo.com/v1/forecast'),
+                # Hilos de fetch: la etapa HTTP solo espera red, y el único hilo que
+                # escribe en MySQL es el escritor, así que no multiplica conexiones
+                'fetch_concurrency': int(os.getenv('FETCH_CONCURRENCY', '64')),
+                'request_timeout': int(os.getenv('REQUEST_TIMEOUT', '30')),
+                'max_retries': int(os.getenv('MAX_RETRIES', '3')),
+                # Registros por lote encolado hacia el escritor (no es el lote de escritura)
+                'streaming_batch_size': int(os.getenv('STREAMING_BATCH_SIZE', '10')),
+                # El hilo escritor guarda lo acumulado (de uno o varios sitios) al llegar a
+                # flush_rows registros o flush_seconds desde el primer registro pendiente
+                # (flush_rows acota el INSERT multi-fila para que no supere max_allowed_packet)
+                'flush_rows': int(os.getenv('STREAMING_FLUSH_ROWS', '5000')),
+                'flush_seconds': float(os.getenv('STREAMING_FLUSH_SECONDS', '1')),
+            }
+        return cls._cfg_cache
 
-    def _validate_env_variables(self) -> bool:
+    @staticmethod
+    def _validate_env_variables() -> bool:
         """
         Valida las variables de entorno.
         """
@@ -116,8 +226,9 @@ class WeatherETLStreaming:
         """
         try:
             config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'sites_sample.json')
-            with open(config_path, 'r', encoding='utf-8') as f:
-                sites = json.load(f)
+            with open(config_path, 'rb') as f:
+                raw = f.read()
+            sites = orjson.loads(raw) if orjson else json.loads(raw)
             
             logger.info(f"Cargados {len(sites)} sitios desde configuración")
             return sites
@@ -161,13 +272,13 @@ class WeatherETLStreaming:
         params = {
             'latitude': site['latitude'],
             'longitude': site['longitude'],
-            'current': 'temperature_2m,relative_humidity_2m,wind_speed_10m',
-            'hourly': 'temperature_2m,relative_humidity_2m,precipitation,wind_speed_10m',
+            'current': 'temperature_2m,relative_humidity_2m',
+            'hourly': 'temperature_2m,relative_humidity_2m,precipitation',
             'timezone': site['timezone'],
         }
         
         # Realizar llamada a la API
-        response = requests.get(
+        response = self.session.get(
             self.api_base,
             params=params,
             timeout=self.request_timeout
@@ -177,14 +288,18 @@ class WeatherETLStreaming:
             logger.warning(f"WARNING: Respuesta {response.status_code} de la API para {site['site_id']}. Reintentando...")
             raise requests.exceptions.RequestException(f"Respuesta {response.status_code}")
         elif response.status_code == 200: 
-            data = response.json()
+            try:
+                data = orjson.loads(response.content) if orjson else response.json()
+            except ValueError as e:
+                # Cuerpo truncado o inválido: se reintenta como cualquier error de red
+                raise requests.exceptions.RequestException(f"JSON inválido en la respuesta: {e}") from e
             logger.info(f"Datos obtenidos para sitio {site['site_id']} ({site['name']})")
             return data
         else:
             logger.error(f"Estado inesperado para {site['site_id']}: status code: {response.status_code}")
             raise requests.exceptions.RequestException(f"Respuesta {response.status_code}")
     
-    def normalize_weather_data_streaming(self, raw_data: Dict, site: Dict) -> Iterator[Dict]:
+    def normalize_weather_data_streaming(self, raw_data: Dict, site: Dict) -> Iterator[Tuple]:
         """
         Normaliza los datos meteorológicos en modo streaming (generador).
         Procesa tanto datos 'current' como 'hourly' y los yield uno por uno.
@@ -194,10 +309,13 @@ class WeatherETLStreaming:
             site: Diccionario con información del sitio
             
         Yields:
-            Diccionarios con datos normalizados uno por uno
+            Tuplas en el orden de INSERT_WEATHER_OBSERVATION_COLUMNS:
+            (site_id, observation_time, temp_c, humidity_pct, precipitation_mm,
+            ingestion_run_id, fetch_time)
         """
         site_id = site['site_id']
         now_utc = datetime.now(timezone.utc)
+        run_id = self.ingestion_run_id
         
         try:
             # Procesar datos CURRENT (tiempo actual)
@@ -205,20 +323,17 @@ class WeatherETLStreaming:
                 current = raw_data['current']
                 current_time_str = current.get('time')
                 if current_time_str:
-                    observation_time = datetime.fromisoformat(current_time_str.replace('Z', '+00:00'))
+                    observation_time = _parse_iso(current_time_str)
                     
-                    normalized_record = {
-                        "site_id": site_id,
-                        "observation_time": observation_time,
-                        "fetch_time": now_utc,
-                        "temp_c": current.get('temperature_2m'),
-                        "humidity_pct": current.get('relative_humidity_2m'),
-                        "precipitation_mm": str(current.get('precipitation', 0)),
-                        "wind_speed_10m": current.get('wind_speed_10m'),  # Nuevo campo
-                        "ingestion_run_id": self.ingestion_run_id,
-                        "data_type": "current"  # Marca si es current o hourly
-                    }
-                    yield normalized_record
+                    yield (
+                        site_id,
+                        observation_time,
+                        current.get('temperature_2m'),
+                        current.get('relative_humidity_2m'),
+                        current.get('precipitation', 0.0),
+                        run_id,
+                        now_utc
+                    )
             
             # Procesar datos HOURLY (pronóstico)
             if "hourly" in raw_data:
@@ -227,141 +342,142 @@ class WeatherETLStreaming:
                 temps = hourly.get("temperature_2m", [])
                 hums = hourly.get("relative_humidity_2m", [])
                 precs = hourly.get("precipitation", [])
-                winds = hourly.get("wind_speed_10m", [])
                 
-                if times:
-                    for i in range(len(times)):
-                        observation_time = datetime.fromisoformat(times[i].replace('Z', '+00:00'))
-                        
-                        # Verificación defensiva
-                        temp_c = temps[i] if i < len(temps) else None
-                        humidity_pct = hums[i] if i < len(hums) else None
-                        precipitation_mm = precs[i] if i < len(precs) else None
-                        wind_speed = winds[i] if i < len(winds) else None
-                        
-                        normalized_record = {
-                            "site_id": site_id,
-                            "observation_time": observation_time,
-                            "fetch_time": now_utc,
-                            "temp_c": temp_c,
-                            "humidity_pct": humidity_pct,
-                            "precipitation_mm": str(precipitation_mm) if precipitation_mm is not None else "0",
-                            "wind_speed_10m": wind_speed,
-                            "ingestion_run_id": self.ingestion_run_id,
-                            "data_type": "hourly"
-                        }
-                        yield normalized_record
+                # Las listas de valores se rellenan con None para tolerar longitudes
+                # distintas; zip se detiene en el último timestamp
+                for time_str, temp_c, humidity_pct, precipitation_mm in zip(
+                    times,
+                    chain(temps, repeat(None)),
+                    chain(hums, repeat(None)),
+                    chain(precs, repeat(None))
+                ):
+                    yield (
+                        site_id,
+                        _parse_iso(time_str),
+                        temp_c,
+                        humidity_pct,
+                        precipitation_mm if precipitation_mm is not None else 0.0,
+                        run_id,
+                        now_utc
+                    )
             
         except Exception as e:
             logger.error(f"Error normalizando datos para sitio {site_id}: {e}")
             raise
 
     def get_db_connection(self):
-        """Obtiene una conexión a la base de datos MySQL."""
+        """
+        Obtiene la conexión MySQL del hilo escritor, creándola la primera vez.
+        
+        La conexión queda abierta y se reutiliza en los siguientes lotes y ciclos;
+        se cierra con close().
+        """
         try:
-            connection = pymysql.connect(**self.db_config)
-            return connection
+            if self._conn is None:
+                self._conn = pymysql.connect(**self.db_config)
+            else:
+                self._conn.ping(reconnect=True)
+            return self._conn
         except Exception as e:
             logger.error(f"Error conectando a MySQL: {e}")
             raise
-    
-    def save_weather_record_streaming(self, weather_data: Dict) -> bool:
-        """
-        Guarda un registro meteorológico individual (modo streaming).
-        
-        Args:
-            weather_data: Diccionario con datos normalizados
-            
-        Returns:
-            True si se guardó exitosamente, False en caso contrario
-        """
-        if self.dry_run:
-            logger.debug(f"[DRY-RUN] Guardando registro para {weather_data['site_id']} - {weather_data['observation_time']}")
-            return True
-        
+
+    def close_db_connections(self):
+        """Cierra la conexión MySQL del hilo escritor, si está abierta."""
+        if self._conn is None:
+            return
         try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    insert_query = get_insert_weather_observation_query()
-                    
-                    # Convertir diccionario a tupla en el orden correcto
-                    # Nota: wind_speed_10m no está en la tabla actual, se omite por ahora
-                    params = (
-                        weather_data['site_id'],
-                        weather_data['observation_time'],
-                        weather_data['temp_c'],
-                        weather_data['humidity_pct'],
-                        weather_data['precipitation_mm'],
-                        weather_data['ingestion_run_id'],
-                        weather_data['fetch_time']
-                    )
-                    
-                    cursor.execute(insert_query, params)
-                    conn.commit()
-                    return True
-            
+            self._conn.close()
+        except Exception as e:
+            logger.debug(f"Error cerrando conexión MySQL: {e}")
+        self._conn = None
+
+    def close(self):
+        """Libera la sesión HTTP y la conexión MySQL al terminar el proceso."""
+        self.session.close()
+        self.close_db_connections()
+
+    def _rollback_quietly(self):
+        """Revierte la transacción en curso del escritor, si la hay."""
+        if self._conn is None:
+            return
+        try:
+            self._conn.rollback()
         except Exception as e:
-            logger.warning(f"Error guardando registro individual: {e}")
-            return False
+            logger.debug(f"Error revirtiendo transacción: {e}")
     
-    def save_weather_batch_streaming(self, weather_data_batch: List[Dict]) -> Tuple[int, int]:
+    def save_weather_batch_streaming(self, weather_data_batch: List[Tuple]) -> Tuple[int, int]:
         """
-        Guarda un lote pequeño de registros (optimización para streaming).
+        Guarda un lote de registros con un solo executemany + commit.
         
         Args:
-            weather_data_batch: Lista de diccionarios con datos normalizados
+            weather_data_batch: Lista de tuplas normalizadas, en el orden de columnas
+                de INSERT_WEATHER_OBSERVATION
             
         Returns:
             Tupla (registros_exitosos, total_registros)
+            
+        Raises:
+            ValueError: Si las filas no tienen una columna por cada
+                INSERT_WEATHER_OBSERVATION_COLUMNS
         """
-        if self.dry_run:
-            return len(weather_data_batch), len(weather_data_batch)
-        
         if not weather_data_batch:
             return 0, 0
         
+        # Las filas de un lote son homogéneas: basta con verificar la primera
+        check_weather_observation_row(weather_data_batch[0])
+        
+        if self.dry_run:
+            return len(weather_data_batch), len(weather_data_batch)
+        
         successful = 0
         try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    insert_query = get_insert_weather_observation_query()
-                    
-                    params_list = []
-                    for weather_data in weather_data_batch:
-                        params = (
-                            weather_data['site_id'],
-                            weather_data['observation_time'],
-                            weather_data['temp_c'],
-                            weather_data['humidity_pct'],
-                            weather_data['precipitation_mm'],
-                            weather_data['ingestion_run_id'],
-                            weather_data['fetch_time']
-                        )
-                        params_list.append(params)
-                    
-                    cursor.executemany(insert_query, params_list)
-                    conn.commit()
-                    successful = len(params_list)
+            conn = self.get_db_connection()
+            with conn.cursor() as cursor:
+                # Los registros ya vienen como tuplas posicionales
+                cursor.executemany(self.insert_query, weather_data_batch)
+                conn.commit()
+                successful = len(weather_data_batch)
             
             return successful, len(weather_data_batch)
             
         except Exception as e:
             logger.error(f"Error guardando batch streaming: {e}")
+            self._rollback_quietly()
             # Fallback: guardar uno por uno
             return self._save_weather_data_fallback(weather_data_batch)
     
-    def _save_weather_data_fallback(self, weather_data_list: List[Dict]) -> Tuple[int, int]:
-        """Fallback: guarda registros uno por uno si el batch falla."""
+    def _save_weather_data_fallback(self, weather_data_list: List[Tuple]) -> Tuple[int, int]:
+        """
+        Fallback: inserta los registros uno por uno si el batch falla.
+        
+        Todas las filas van en una sola transacción con un único commit final: un
+        error de datos en InnoDB solo revierte la sentencia fallida, así que el
+        resto del lote se conserva sin pagar un commit (fsync) por fila.
+        Cualquier otro error (conexión caída, deadlock, lock wait timeout) puede
+        haber revertido la transacción entera: se hace rollback y se reporta 0.
+        """
         successful = 0
-        for weather_data in weather_data_list:
-            if self.save_weather_record_streaming(weather_data):
-                successful += 1
+        try:
+            conn = self.get_db_connection()
+            with conn.cursor() as cursor:
+                for weather_data in weather_data_list:
+                    try:
+                        cursor.execute(self.insert_query, weather_data)
+                        successful += 1
+                    except (pymysql.err.DataError, pymysql.err.IntegrityError) as e:
+                        logger.warning(f"Error guardando registro individual: {e}")
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error en fallback de guardado individual: {e}")
+            self._rollback_quietly()
+            successful = 0
         return successful, len(weather_data_list)
     
     def process_site_streaming(self, site: Dict) -> Tuple[bool, str, int]:
         """
-        Procesa un sitio individual en modo streaming: obtiene datos y los guarda
-        inmediatamente a medida que se normalizan.
+        Procesa un sitio individual en modo streaming: obtiene datos y los envía
+        al hilo escritor a medida que se normalizan.
         
         Args:
             site: Diccionario con información del sitio
@@ -376,27 +492,11 @@ class WeatherETLStreaming:
             if raw_data is None:
                 return False, f"No se pudieron obtener datos para {site['name']}", 0
             
-            # Procesar en modo streaming: normalizar y guardar en lotes pequeños
-            batch = []
-            records_processed = 0
-            
-            for normalized_record in self.normalize_weather_data_streaming(raw_data, site):
-                batch.append(normalized_record)
-                records_processed += 1
-                
-                # Cuando el lote alcanza el tamaño, guardar
-                if len(batch) >= self.streaming_batch_size:
-                    successful, total = self.save_weather_batch_streaming(batch)
-                    batch = []  # Limpiar lote
-                    
-                    if successful < total:
-                        logger.warning(f"Guardados parcialmente {successful}/{total} registros del lote")
-            
-            # Guardar el lote restante
-            if batch:
-                successful, total = self.save_weather_batch_streaming(batch)
-                if successful < total:
-                    logger.warning(f"Guardados parcialmente {successful}/{total} registros del lote final")
+            if self.dry_run:
+                # En dry-run solo importan los conteos: no se normaliza ni se encola nada
+                records_processed = self._count_records(raw_data)
+            else:
+                records_processed = self._enqueue_site_records(raw_data, site)
             
             if records_processed > 0:
                 return True, f"Datos procesados exitosamente para {site['name']} - {records_processed} registros", records_processed
@@ -408,6 +508,103 @@ class WeatherETLStreaming:
             logger.error(error_msg)
             return False, error_msg, 0
     
+    def _enqueue_site_records(self, raw_data: Dict, site: Dict) -> int:
+        """
+        Normaliza los datos de un sitio y los encola en lotes pequeños; el hilo
+        escritor los agrupa con los de otros sitios antes de guardar.
+        
+        Returns:
+            Cantidad de registros encolados
+        """
+        batch = []
+        records_processed = 0
+        
+        for normalized_record in self.normalize_weather_data_streaming(raw_data, site):
+            batch.append(normalized_record)
+            records_processed += 1
+            
+            if len(batch) >= self.streaming_batch_size:
+                self.write_queue.put(batch)
+                batch = []
+        
+        if batch:
+            self.write_queue.put(batch)
+        
+        return records_processed
+
+    @staticmethod
+    def _count_records(raw_data: Dict) -> int:
+        """Cuenta los registros que generaría normalize_weather_data_streaming."""
+        current = raw_data.get('current') or {}
+        hourly = raw_data.get('hourly') or {}
+        return (1 if current.get('time') else 0) + len(hourly.get('time') or ())
+
+    def _start_writer(self):
+        """Inicia el hilo escritor que guarda en MySQL los lotes encolados."""
+        self._writer_thread = threading.Thread(target=self._writer_loop, name='db-writer', daemon=True)
+        self._writer_thread.start()
+
+    def _stop_writer(self):
+        """Envía la señal de fin al hilo escritor y espera a que vacíe la cola."""
+        if self._writer_thread is None:
+            return
+        self.write_queue.put(None)
+        self._writer_thread.join()
+        self._writer_thread = None
+
+    def _writer_loop(self):
+        """
+        Hilo escritor: drena la cola y guarda con save_weather_batch_streaming.
+        
+        Es el único hilo que escribe en MySQL. Los lotes de todos los sitios se
+        acumulan hasta flush_rows registros o hasta flush_seconds desde el primer
+        registro pendiente, y se guardan con un solo executemany + commit.
+        """
+        if not self.dry_run:
+            try:
+                self.get_db_connection()
+            except Exception:
+                logger.warning("No se pudo abrir la conexión del escritor por adelantado; se reintentará al guardar")
+        
+        pending = []
+        deadline = 0.0
+        while True:
+            # Sin registros pendientes se espera sin límite; con pendientes, hasta el deadline
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            try:
+                batch = self.write_queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_pending(pending)
+                continue
+            
+            if batch is None:
+                self._flush_pending(pending)
+                break
+            
+            if not pending:
+                deadline = time.monotonic() + self.flush_seconds
+            pending.extend(batch)
+            if len(pending) >= self.flush_rows or time.monotonic() >= deadline:
+                self._flush_pending(pending)
+
+    def _flush_pending(self, pending: List[Tuple]):
+        """Guarda los registros acumulados por el hilo escritor y vacía el buffer."""
+        if not pending:
+            return
+        
+        try:
+            successful, total = self.save_weather_batch_streaming(pending)
+        except Exception as e:
+            logger.error(f"Error inesperado en el hilo escritor: {e}")
+            successful, total = 0, len(pending)
+        
+        self.stats['records_saved'] += successful
+        if successful < total:
+            self.stats['records_failed'] += total - successful
+            logger.warning(f"Guardados parcialmente {successful}/{total} registros del lote")
+        
+        pending.clear()
+
     def run_etl_streaming(self):
         """Ejecuta el proceso ETL completo en modo streaming."""
         try:
@@ -419,10 +616,13 @@ class WeatherETLStreaming:
                 logger.warning("No se encontraron sitios para procesar")
                 return
             
-            logger.info(f"Procesando {len(sites)} sitios con {self.max_workers} workers (modo streaming)")
+            workers = min(len(sites), self.fetch_concurrency)
+            logger.info(f"Procesando {len(sites)} sitios con {workers} workers (modo streaming)")
+            
+            self._start_writer()
             
             # Procesar sitios en paralelo
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch') as executor:
                 # Enviar tareas
                 future_to_site = {
                     executor.submit(self.process_site_streaming, site): site 
@@ -454,23 +654,32 @@ class WeatherETLStreaming:
                         
                         pbar.update(1)
             
+            # Esperar a que el escritor guarde todo lo encolado
+            self._stop_writer()
+            
             # Mostrar resumen final
             self._print_summary()
             
         except Exception as e:
             logger.error(f"Error crítico en ETL Streaming: {e}")
             sys.exit(1)
+        finally:
+            self._stop_writer()
+            # No arrastrar timestamps de este ciclo al siguiente en modo continuo
+            _parse_iso.cache_clear()
     
     def _print_summary(self):
         """Imprime el resumen final de la ejecución."""
         logger.info("=" * 60)
         logger.info("RESUMEN DE EJECUCIÓN ETL STREAMING")
         logger.info("=" * 60)
-        logger.info(f"Run ID: {self.ingestion_run_id}")
+        logger.info(f"Run ID: {self.ingestion_run_id_str}")
         logger.info(f"Total sitios: {self.stats['total_sites']}")
         logger.info(f"Exitosos: {self.stats['successful']}")
         logger.info(f"Fallidos: {self.stats['failed']}")
         logger.info(f"Total registros procesados: {self.stats['records_processed']}")
+        logger.info(f"Registros guardados: {self.stats['records_saved']}")
+        logger.info(f"Registros con error: {self.stats['records_failed']}")
         logger.info(f"Modo dry-run: {'SÍ' if self.dry_run else 'NO'}")
         
         if self.stats['errors']:
@@ -500,13 +709,15 @@ def run_continuous(etl_instance: WeatherETLStreaming, interval_seconds: int):
             logger.info(f"Ejecutando ciclo de streaming - {datetime.now().isoformat()}")
             logger.info(f"{'='*60}\n")
             
-            # Crear nueva instancia para cada ejecución (nuevo run_id)
-            etl = WeatherETLStreaming(dry_run=etl_instance.dry_run)
-            etl.run_etl_streaming()
+            etl_instance.run_etl_streaming()
             
             logger.info(f"\nEsperando {interval_seconds} segundos hasta la próxima ejecución...")
             time.sleep(interval_seconds)
             
+            # Reutilizar la instancia (sesión HTTP, conexión MySQL y configuración)
+            # con un nuevo run_id
+            etl_instance._reset_run_state()
+            
     except KeyboardInterrupt:
         logger.info("\n\nDeteniendo modo continuo. Hasta luego!")
 
@@ -532,10 +743,13 @@ def main():
     etl = WeatherETLStreaming(dry_run=args.dry_run)
     
     # Ejecutar una vez o en modo continuo
-    if args.interval and args.interval > 0:
-        run_continuous(etl, args.interval)
-    else:
-        etl.run_etl_streaming()
+    try:
+        if args.interval and args.interval > 0:
+            run_continuous(etl, args.interval)
+        else:
+            etl.run_etl_streaming()
+    finally:
+        etl.close()
 
 
 if __name__ == '__main__':
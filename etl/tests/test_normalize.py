@@ -0,0 +1,85 @@
+"""
+Tests de los normalizadores de ambos ETL.
+
+Verifica que cada tupla generada tenga una columna por cada entrada de
+INSERT_WEATHER_OBSERVATION_COLUMNS, en el orden esperado por el INSERT.
+
+Uso (desde etl/):
+    python -m unittest discover -s tests
+"""
+
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+from etl_weather import WeatherETL
+from etl_weather_streaming import WeatherETLStreaming
+from utils.db_queries import INSERT_WEATHER_OBSERVATION_COLUMNS
+
+SITE = {'site_id': 1, 'name': 'Test', 'lat': -34.6, 'lon': -58.4}
+
+# Respuesta mínima de la API: un timestamp repetido y listas de valores
+# más cortas que la de timestamps
+RAW_DATA = {
+    'current': {
+        'time': '2024-01-01T03:00',
+        'temperature_2m': 25.1,
+        'relative_humidity_2m': 60,
+        'precipitation': 0.0,
+    },
+    'hourly': {
+        'time': ['2024-01-01T00:00', '2024-01-01T01:00', '2024-01-01T01:00', '2024-01-01T02:00'],
+        'temperature_2m': [24.0, 23.5, 23.5],
+        'relative_humidity_2m': [70, 72],
+        'precipitation': [0.0, 0.2, 0.2, 0.0],
+    },
+}
+
+RUN_ID = uuid.uuid4()
+COLUMN_COUNT = len(INSERT_WEATHER_OBSERVATION_COLUMNS)
+
+
+class TestNormalizeWeatherData(unittest.TestCase):
+    """Normalizador del ETL batch (_normalize_weather_data)."""
+
+    def setUp(self):
+        # Solo se usan ingestion_run_id y fetch_time: no hace falta configurar el ETL
+        self.etl = object.__new__(WeatherETL)
+        self.etl.ingestion_run_id = RUN_ID.bytes
+        self.etl.fetch_time = datetime.now(timezone.utc)
+
+    def test_rows_match_insert_columns(self):
+        rows = list(self.etl._normalize_weather_data(RAW_DATA, SITE))
+
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertEqual(len(row), COLUMN_COUNT)
+            self.assertEqual(row[0], SITE['site_id'])
+            self.assertEqual(row[5], self.etl.ingestion_run_id)
+
+    def test_missing_hourly_raises(self):
+        with self.assertRaises(ValueError):
+            list(self.etl._normalize_weather_data({}, SITE))
+
+
+class TestNormalizeWeatherDataStreaming(unittest.TestCase):
+    """Normalizador del ETL streaming (normalize_weather_data_streaming)."""
+
+    def setUp(self):
+        # Solo se usa ingestion_run_id: no hace falta configurar el ETL
+        self.etl = object.__new__(WeatherETLStreaming)
+        self.etl.ingestion_run_id = RUN_ID.bytes
+
+    def test_rows_match_insert_columns(self):
+        rows = list(self.etl.normalize_weather_data_streaming(RAW_DATA, SITE))
+
+        # 1 registro current + 4 hourly
+        self.assertEqual(len(rows), 5)
+        for row in rows:
+            self.assertEqual(len(row), COLUMN_COUNT)
+            self.assertEqual(row[0], SITE['site_id'])
+            self.assertEqual(row[5], self.etl.ingestion_run_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
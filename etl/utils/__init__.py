@@ -4,11 +4,15 @@ Módulo de utilidades para el ETL de datos meteorológicos.
 
 from .db_queries import (
     get_insert_weather_observation_query,
-    INSERT_WEATHER_OBSERVATION
+    check_weather_observation_row,
+    INSERT_WEATHER_OBSERVATION,
+    INSERT_WEATHER_OBSERVATION_COLUMNS
 )
 
 __all__ = [
     'get_insert_weather_observation_query',
-    'INSERT_WEATHER_OBSERVATION'
+    'check_weather_observation_row',
+    'INSERT_WEATHER_OBSERVATION',
+    'INSERT_WEATHER_OBSERVATION_COLUMNS'
 ]
 
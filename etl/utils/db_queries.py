@@ -14,21 +14,45 @@ Uso:
     cursor.execute(query, weather_data)
 """
 
+# Orden de columnas de INSERT_WEATHER_OBSERVATION: los normalizadores de ambos
+# ETL generan tuplas posicionales en este orden, listas para executemany
+INSERT_WEATHER_OBSERVATION_COLUMNS = (
+    'site_id', 'observation_time', 'temp_c', 'humidity_pct',
+    'precipitation_mm', 'ingestion_run_id', 'fetch_time'
+)
+
 # Query de inserción/actualización de observaciones meteorológicas
 # Utiliza ON DUPLICATE KEY UPDATE para garantizar idempotencia
 # La clave única es (site_id, observation_time, temp_c) según init.sql
-INSERT_WEATHER_OBSERVATION = """
+# La cláusula VALUES debe contener solo placeholders %s (los saltos de línea no
+# importan): así pymysql reescribe cursor.executemany() como un único INSERT multi-fila.
+# Variables de sesión (@run_id) o literales dentro de VALUES rompen esa
+# reescritura y executemany vuelve a un INSERT por fila.
+#
+# Si la fila ya existe con los mismos valores, todas las asignaciones dejan la
+# fila igual y MySQL no la reescribe (0 filas afectadas): re-ejecutar el ETL
+# sobre el mismo rango no genera escrituras. Las columnas de auditoría solo se
+# actualizan cuando cambia algún valor; por eso se asignan antes que los valores
+# (MySQL evalúa las asignaciones de izquierda a derecha).
+#
+# La lista de columnas y los placeholders se generan desde
+# INSERT_WEATHER_OBSERVATION_COLUMNS para que no puedan divergir.
+INSERT_WEATHER_OBSERVATION = f"""
 INSERT INTO weather_observations 
-(site_id, observation_time, temp_c, humidity_pct, 
-precipitation_mm, ingestion_run_id, fetch_time)
-VALUES (%s, %s, %s, %s, %s, %s, %s)
+({', '.join(INSERT_WEATHER_OBSERVATION_COLUMNS)})
+VALUES ({', '.join(['%s'] * len(INSERT_WEATHER_OBSERVATION_COLUMNS))})
 ON DUPLICATE KEY UPDATE
-    fetch_time = VALUES(fetch_time),
-    temp_c = VALUES(temp_c),
+    audit_updated_dttm = IF(
+        humidity_pct <=> VALUES(humidity_pct) AND precipitation_mm <=> VALUES(precipitation_mm),
+        audit_updated_dttm, UTC_TIMESTAMP(3)),
+    fetch_time = IF(
+        humidity_pct <=> VALUES(humidity_pct) AND precipitation_mm <=> VALUES(precipitation_mm),
+        fetch_time, VALUES(fetch_time)),
+    ingestion_run_id = IF(
+        humidity_pct <=> VALUES(humidity_pct) AND precipitation_mm <=> VALUES(precipitation_mm),
+        ingestion_run_id, VALUES(ingestion_run_id)),
     humidity_pct = VALUES(humidity_pct),
-    precipitation_mm = VALUES(precipitation_mm),
-    ingestion_run_id = VALUES(ingestion_run_id),
-    audit_updated_dttm = UTC_TIMESTAMP(3)
+    precipitation_mm = VALUES(precipitation_mm)
 """
 
 
@@ -42,3 +66,21 @@ def get_insert_weather_observation_query() -> str:
     return INSERT_WEATHER_OBSERVATION
 
 
+def check_weather_observation_row(row: tuple) -> None:
+    """
+    Verifica que una fila normalizada tenga una columna por cada
+    INSERT_WEATHER_OBSERVATION_COLUMNS.
+    
+    Los normalizadores generan filas homogéneas, así que basta con verificar
+    la primera fila de cada lote antes del executemany.
+    
+    Raises:
+        ValueError: Si la cantidad de valores no coincide con las columnas
+    """
+    if len(row) != len(INSERT_WEATHER_OBSERVATION_COLUMNS):
+        raise ValueError(
+            f"Fila con {len(row)} valores; se esperaban {len(INSERT_WEATHER_OBSERVATION_COLUMNS)} "
+            f"({', '.join(INSERT_WEATHER_OBSERVATION_COLUMNS)})"
+        )
+
+
@@ -20,8 +20,8 @@ CREATE TABLE weather_observations (
     observation_time DATETIME(3) NOT NULL,
     temp_c DECIMAL(5,2) NULL,
     humidity_pct TINYINT NULL,
-    precipitation_mm VARCHAR(255) NULL,
-    ingestion_run_id VARCHAR(64) NULL,
+    precipitation_mm DECIMAL(6,2) NULL,
+    ingestion_run_id BINARY(16) NULL,
     fetch_time DATETIME(3) NOT NULL DEFAULT (UTC_TIMESTAMP(3)),
     audit_created_dttm DATETIME(3) DEFAULT (UTC_TIMESTAMP(3)),
     audit_updated_dttm DATETIME(3) NULL,
@@ -30,7 +30,7 @@ CREATE TABLE weather_observations (
     UNIQUE KEY uq_site_source_obs (site_id, observation_time, temp_c),
     
     -- Índices para optimizar consultas frecuentes
-    INDEX idx_site_obs_time (site_id, observation_time),
+    -- (las búsquedas por (site_id, observation_time) usan el prefijo de la clave única)
     INDEX idx_ingestion_run (ingestion_run_id),
     INDEX idx_audit_created (audit_created_dttm)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
\ No newline at end of file
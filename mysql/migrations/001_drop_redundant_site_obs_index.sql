@@ -0,0 +1,14 @@
+-- Migración 001: eliminar índice redundante en weather_observations
+-- Versión: 1.0
+-- Descripción: idx_site_obs_time (site_id, observation_time) es prefijo izquierdo de
+--              la clave única uq_site_source_obs (site_id, observation_time, temp_c),
+--              que ya resuelve las mismas búsquedas. Mantenerlo solo agrega una
+--              escritura de B-tree por cada INSERT.
+--
+-- Verificación previa (opcional):
+--   SHOW INDEX FROM weather_observations;
+--   SELECT * FROM sys.schema_redundant_indexes WHERE table_name = 'weather_observations';
+
+USE testdb;
+
+ALTER TABLE weather_observations DROP INDEX idx_site_obs_time;
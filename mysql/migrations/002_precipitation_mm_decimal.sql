@@ -0,0 +1,14 @@
+-- Migración 002: precipitation_mm como columna numérica
+-- Versión: 1.0
+-- Descripción: precipitation_mm se guardaba como VARCHAR(255) con el valor formateado
+--              como texto (incluyendo 'None' para valores nulos). Se convierte a
+--              DECIMAL(6,2): menos bytes por fila y sin conversión de texto en el ETL.
+
+USE testdb;
+
+-- Normalizar valores que no son numéricos antes de cambiar el tipo
+UPDATE weather_observations
+SET precipitation_mm = NULL
+WHERE precipitation_mm IN ('None', '');
+
+ALTER TABLE weather_observations MODIFY precipitation_mm DECIMAL(6,2) NULL;
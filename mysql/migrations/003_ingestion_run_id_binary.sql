@@ -0,0 +1,20 @@
+-- Migración 003: ingestion_run_id como BINARY(16)
+-- Versión: 1.0
+-- Descripción: ingestion_run_id se guardaba como VARCHAR(64) con el UUID en texto
+--              (36 caracteres por fila). Se convierte a BINARY(16) con los bytes del
+--              UUID: menos bytes por fila y en el índice idx_ingestion_run.
+--              Para consultar en formato texto: BIN_TO_UUID(ingestion_run_id).
+
+USE testdb;
+
+ALTER TABLE weather_observations ADD COLUMN ingestion_run_id_bin BINARY(16) NULL AFTER ingestion_run_id;
+
+UPDATE weather_observations
+SET ingestion_run_id_bin = UUID_TO_BIN(ingestion_run_id)
+WHERE ingestion_run_id IS NOT NULL;
+
+ALTER TABLE weather_observations
+    DROP INDEX idx_ingestion_run,
+    DROP COLUMN ingestion_run_id,
+    RENAME COLUMN ingestion_run_id_bin TO ingestion_run_id,
+    ADD INDEX idx_ingestion_run (ingestion_run_id);